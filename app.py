@@ -1,13 +1,22 @@
 import os
+import hashlib
 import logging
+import shutil
 from datetime import datetime
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, session, abort, make_response
+from flask_caching import Cache
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from werkzeug.utils import secure_filename
-from sqlalchemy.orm import DeclarativeBase
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy import func, insert, literal, select, union_all, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import DeclarativeBase, joinedload, selectinload, undefer
 from dotenv import load_dotenv
-import uuid
+import secrets
 
 # Import config + models
 from config import get_config
@@ -31,11 +40,27 @@ app = Flask(__name__)
 config_name = os.environ.get('FLASK_ENV', 'development')
 app.config.from_object(get_config())
 
+# Skip template mtime checks and reuse compiled templates across restarts in production
+if app.config.get('JINJA_BYTECODE_CACHE'):
+    app.jinja_env.auto_reload = False
+    if app.config.get('JINJA_CACHE_DIR'):
+        os.makedirs(app.config['JINJA_CACHE_DIR'], mode=0o700, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory=app.config['JINJA_CACHE_DIR'])
+    else:
+        # Jinja's default is a per-user 0700 directory it checks the owner of
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+
 # --- Database URL Fix for Supabase ---
 db_url = os.getenv("DATABASE_URL")
 
-if db_url and db_url.startswith("postgres://"):
-    db_url = db_url.replace("postgres://", "postgresql://", 1)
+# Use the psycopg 3 driver, which can prepare hot statements server-side
+if db_url and db_url.startswith(("postgres://", "postgresql://")):
+    db_url = "postgresql+psycopg://" + db_url.split("://", 1)[1]
+
+# Route through the Supabase pooler (usually 6543) when its port is provided
+pooler_port = os.getenv("DB_POOLER_PORT")
+if db_url and pooler_port:
+    db_url = make_url(db_url).set(port=int(pooler_port)).render_as_string(hide_password=False)
 
 if db_url and "sslmode" not in db_url:
     db_url += "?sslmode=require"
@@ -46,12 +71,38 @@ if not db_url:
 app.config["SQLALCHEMY_DATABASE_URI"] = db_url
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+# Prepare statements after 5 executions; transaction-mode poolers can't keep them
+if db_url.startswith("postgresql+psycopg://"):
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        **app.config["SQLALCHEMY_ENGINE_OPTIONS"],
+        "connect_args": {"prepare_threshold": None if pooler_port else 5},
+    }
+
 # Init DB
 db.init_app(app)
 
-# Ensure tables exist
-with app.app_context():
-    db.create_all()
+
+def init_db():
+    """Create any missing tables, then drop pooled connections so forked workers start clean"""
+    with app.app_context():
+        db.create_all()
+        db.engine.dispose()
+
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Create database tables."""
+    init_db()
+    print("Database tables created.")
+
+
+# Create tables on startup outside production; production runs `flask init-db`
+# (or sets FLASK_INIT_DB) so every worker doesn't repeat the schema introspection
+if config_name != 'production' or os.environ.get('FLASK_INIT_DB'):
+    init_db()
+
+# Response cache for public pages
+cache = Cache(app)
 
 # Flask-Login setup
 login_manager = LoginManager()
@@ -61,14 +112,19 @@ login_manager.login_message = 'Please log in to access this page.'
 
 # Configuration for uploads
 UPLOAD_FOLDER = 'static/uploads'
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'webp'})
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB
+UPLOAD_CHUNK_SIZE = 64 * 1024  # copy buffer for streaming uploads
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
 
 # Ensure upload folder exists
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+if not os.path.isdir(UPLOAD_FOLDER):
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+# Argon2id parameters tuned for roughly 100 ms per hash
+password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=2)
 
 # Categories for filtering
 CATEGORIES = [
@@ -76,38 +132,134 @@ CATEGORIES = [
     'Bags', 'Books', 'Pets', 'Vehicles', 'Sports Equipment', 'Other'
 ]
 
+# Number of items shown per page on browse/search
+ITEMS_PER_PAGE = 24
+
+# GET endpoints whose anonymous responses may be cached by browsers and CDNs
+PUBLIC_CACHE_ENDPOINTS = {'index', 'browse_items', 'item_detail'}
+
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return db.session.get(User, int(user_id))
+
+
+def verify_password(user, password):
+    """Check a password, re-hashing legacy Werkzeug or outdated Argon2 hashes on success"""
+    stored = user.password_hash
+    if stored.startswith('$argon2'):
+        try:
+            password_hasher.verify(stored, password)
+        except (VerificationError, InvalidHashError):
+            return False
+        if not password_hasher.check_needs_rehash(stored):
+            return True
+    elif not check_password_hash(stored, password):
+        return False
+
+    try:
+        user.password_hash = password_hasher.hash(password)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error upgrading password hash: {str(e)}")
+    return True
 
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    i = filename.rfind('.')
+    return i > 0 and filename[i + 1:].lower() in ALLOWED_EXTENSIONS
+
+
+def has_image_signature(file):
+    """Check the upload's leading magic bytes so non-images are rejected before saving"""
+    head = file.stream.read(12)
+    file.stream.seek(0)
+    return (head.startswith((b'\x89PNG\r\n\x1a\n', b'\xff\xd8\xff', b'GIF87a', b'GIF89a'))
+            or (head[:4] == b'RIFF' and head[8:12] == b'WEBP'))
+
+
+def save_upload(file):
+    """Save an uploaded image before the item is committed and return its filename"""
+    filename = datetime.now().strftime('%Y%m%d_%H%M%S_') + secure_filename(file.filename)
+    path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    try:
+        with open(path, 'wb') as dst:
+            shutil.copyfileobj(file.stream, dst, UPLOAD_CHUNK_SIZE)
+    except Exception:
+        # Don't leave a partial file behind
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return filename
+
+
+def paginate_items(query, page):
+    """Fetch one page of items, reading one extra row to detect a next page"""
+    rows = query.order_by(Item.date_posted.desc(), Item.id.desc()).limit(
+        ITEMS_PER_PAGE + 1).offset((page - 1) * ITEMS_PER_PAGE).all()
+    return rows[:ITEMS_PER_PAGE], len(rows) > ITEMS_PER_PAGE
+
+
+def skip_page_cache():
+    """Only cache pages for anonymous visitors with no pending flash messages"""
+    return current_user.is_authenticated or '_flashes' in session
+
+
+def invalidate_item_pages():
+    """Drop cached pages that list items after an item is created, edited or deleted"""
+    cache.delete('index/anon')
+
+
+def matches_search(text):
+    """Single full-text predicate over the indexed search_vec column"""
+    return Item.search_vec.op('@@')(func.plainto_tsquery('english', text))
 
 
 def generate_item_id():
-    return str(uuid.uuid4())[:8]
+    # 8 URL-safe chars (48 random bits) fit Item.id and collide far less than a uuid4 prefix
+    return secrets.token_urlsafe(6)
 
 
 def create_notification_for_lost_item(item):
     """Create notifications for all users when a lost item is posted"""
     try:
-        users = User.query.filter(User.id != item.user_id).all()
-        for user in users:
-            notification = Notification(
-                title=f"New Lost Item Posted: {item.title}",
-                message=f"A new lost item '{item.title}' was posted in {item.location}.",
-                type='lost_item',
-                user_id=user.id,
-                item_id=item.id
-            )
-            db.session.add(notification)
+        # Fan out with a single INSERT ... SELECT so the database creates one
+        # row per recipient instead of one round-trip per user
+        recipients = db.session.query(
+            literal(f"New Lost Item Posted: {item.title}"),
+            literal(f"A new lost item '{item.title}' was posted in {item.location}."),
+            literal('lost_item'),
+            User.id,
+            literal(item.id)
+        ).filter(User.id != item.user_id)
+        stmt = insert(Notification).from_select(
+            ['title', 'message', 'type', 'user_id', 'item_id'], recipients
+        )
+        db.session.execute(stmt)
         db.session.commit()
     except Exception as e:
+        db.session.rollback()
         logging.error(f"Error creating notifications: {str(e)}")
 
 
+@app.after_request
+def set_cache_headers(response):
+    """Let browsers/CDNs reuse anonymous public pages; make everything else revalidate"""
+    if request.method != 'GET' or request.endpoint == 'static' or 'Cache-Control' in response.headers:
+        return response
+    if (request.endpoint in PUBLIC_CACHE_ENDPOINTS and not current_user.is_authenticated
+            and not session.modified and response.status_code in (200, 304)):
+        response.cache_control.public = True
+        response.cache_control.max_age = 60
+    else:
+        response.cache_control.private = True
+        response.cache_control.max_age = 0
+        response.cache_control.must_revalidate = True
+    response.vary.add('Cookie')
+    return response
+
+
 # ===================
 # AUTH ROUTES
 # ===================
@@ -126,18 +278,10 @@ def register():
             flash('Please fill in all required fields.', 'error')
             return render_template('auth/register.html')
 
-        if User.query.filter_by(username=username).first():
-            flash('Username already exists.', 'error')
-            return render_template('auth/register.html')
-
-        if User.query.filter_by(email=email).first():
-            flash('Email already registered.', 'error')
-            return render_template('auth/register.html')
-
         user = User(
             username=username,
             email=email,
-            password_hash=generate_password_hash(password),
+            password_hash=password_hasher.hash(password),
             first_name=first_name,
             last_name=last_name,
             phone=phone
@@ -148,6 +292,15 @@ def register():
             db.session.commit()
             flash('Registration successful! Please log in.', 'success')
             return redirect(url_for('login'))
+        except IntegrityError:
+            # The unique constraints rejected the insert; look up which field clashed
+            db.session.rollback()
+            existing = db.session.query(User.username).filter(
+                db.or_(User.username == username, User.email == email)).first()
+            if existing and existing.username == username:
+                flash('Username already exists.', 'error')
+            else:
+                flash('Email already registered.', 'error')
         except Exception as e:
             db.session.rollback()
             logging.error(f"Registration error: {str(e)}")
@@ -166,8 +319,8 @@ def login():
             flash('Please enter both username and password.', 'error')
             return render_template('auth/login.html')
 
-        user = User.query.filter_by(username=username).first()
-        if user and check_password_hash(user.password_hash, password):
+        user = User.query.options(undefer(User.password_hash)).filter_by(username=username).first()
+        if user and verify_password(user, password):
             login_user(user)
             next_page = request.args.get('next')
             return redirect(next_page) if next_page else redirect(url_for('index'))
@@ -193,9 +346,11 @@ def logout():
 @login_required
 def dashboard():
     user_items = Item.query.filter_by(user_id=current_user.id).order_by(Item.date_posted.desc()).all()
-    lost_items = Item.query.filter_by(user_id=current_user.id, type='lost').all()
-    found_items = Item.query.filter_by(user_id=current_user.id, type='found').all()
-    unread_notifications = Notification.query.filter_by(user_id=current_user.id, is_read=False).count()
+    # Split the already-fetched items by type instead of querying each type again
+    lost_items = [item for item in user_items if item.type == 'lost']
+    found_items = [item for item in user_items if item.type == 'found']
+    unread_notifications = db.session.query(func.count(Notification.id)).filter_by(
+        user_id=current_user.id, is_read=False).scalar()
     recent_notifications = Notification.query.filter_by(user_id=current_user.id).order_by(
         Notification.created_at.desc()).limit(5).all()
 
@@ -210,16 +365,33 @@ def dashboard():
 @app.route('/notifications')
 @login_required
 def notifications():
-    notifications = Notification.query.filter_by(user_id=current_user.id).order_by(
-        Notification.created_at.desc()).all()
+    notifications = Notification.query.options(selectinload(Notification.item)).filter_by(
+        user_id=current_user.id).order_by(Notification.created_at.desc()).all()
     return render_template('notifications.html', notifications=notifications)
 
 
 @app.route('/notifications/<int:notification_id>/mark_read')
 @login_required
 def mark_notification_read(notification_id):
-    notification = Notification.query.filter_by(id=notification_id, user_id=current_user.id).first_or_404()
-    notification.is_read = True
+    result = db.session.execute(
+        update(Notification)
+        .where(Notification.id == notification_id, Notification.user_id == current_user.id)
+        .values(is_read=True)
+    )
+    if result.rowcount == 0:
+        abort(404)
+    db.session.commit()
+    return redirect(url_for('notifications'))
+
+
+@app.route('/notifications/mark_all_read', methods=['POST'])
+@login_required
+def mark_all_notifications_read():
+    db.session.execute(
+        update(Notification)
+        .where(Notification.user_id == current_user.id, Notification.is_read.is_(False))
+        .values(is_read=True)
+    )
     db.session.commit()
     return redirect(url_for('notifications'))
 
@@ -229,9 +401,17 @@ def mark_notification_read(notification_id):
 # ===================
 
 @app.route('/')
+@cache.cached(key_prefix='index/anon', unless=skip_page_cache)
 def index():
-    recent_lost = Item.query.filter_by(type='lost', status='active').order_by(Item.date_posted.desc()).limit(6).all()
-    recent_found = Item.query.filter_by(type='found', status='active').order_by(Item.date_posted.desc()).limit(6).all()
+    # UNION arms ignore deferred(), so list the page's columns to skip search_vec
+    columns = [column for column in Item.__table__.c if column.key != 'search_vec']
+    lost_q = select(*columns).filter_by(type='lost', status='active').order_by(Item.date_posted.desc()).limit(6)
+    found_q = select(*columns).filter_by(type='found', status='active').order_by(Item.date_posted.desc()).limit(6)
+    # Fetch both lists in one round trip; UNION ALL doesn't keep order, so re-sort each side
+    rows = db.session.execute(select(Item).from_statement(union_all(lost_q, found_q))).scalars().all()
+    recent_items = sorted(rows, key=lambda item: item.date_posted, reverse=True)
+    recent_lost = [item for item in recent_items if item.type == 'lost']
+    recent_found = [item for item in recent_items if item.type == 'found']
     return render_template('index.html', recent_lost=recent_lost, recent_found=recent_found)
 
 
@@ -261,12 +441,8 @@ def post_item(item_type):
         image_filename = None
         if 'image' in request.files:
             file = request.files['image']
-            if file and file.filename != '' and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
-                filename = timestamp + filename
-                file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                image_filename = filename
+            if file and file.filename != '' and allowed_file(file.filename) and has_image_signature(file):
+                image_filename = save_upload(file)
 
         item = Item(
             id=generate_item_id(),
@@ -282,6 +458,7 @@ def post_item(item_type):
 
         db.session.add(item)
         db.session.commit()
+        invalidate_item_pages()
 
         if item_type == 'lost':
             create_notification_for_lost_item(item)
@@ -305,6 +482,7 @@ def browse_items(item_type):
     category = request.args.get('category', '')
     location = request.args.get('location', '')
     search = request.args.get('search', '')
+    page = max(request.args.get('page', 1, type=int), 1)
 
     query = Item.query.filter_by(type=item_type, status='active')
 
@@ -313,15 +491,9 @@ def browse_items(item_type):
     if location:
         query = query.filter(Item.location.ilike(f'%{location}%'))
     if search:
-        query = query.filter(
-            db.or_(
-                Item.title.ilike(f'%{search}%'),
-                Item.description.ilike(f'%{search}%'),
-                Item.location.ilike(f'%{search}%')
-            )
-        )
+        query = query.filter(matches_search(search))
 
-    items = query.order_by(Item.date_posted.desc()).all()
+    items, has_next = paginate_items(query, page)
 
     return render_template('browse.html',
                            items=items,
@@ -329,13 +501,32 @@ def browse_items(item_type):
                            categories=CATEGORIES,
                            current_category=category,
                            current_location=location,
-                           current_search=search)
+                           current_search=search,
+                           page=page,
+                           has_next=has_next)
 
 
 @app.route('/item/<item_id>')
 def item_detail(item_id):
-    item = Item.query.get_or_404(item_id)
-    return render_template('item_detail.html', item=item)
+    # The template shows owner contact details, so load them in the same query
+    item = db.session.get(Item, item_id, options=[joinedload(Item.owner)])
+    if item is None:
+        abort(404)
+    # Pending flash messages are part of the page, so only validate clean renders
+    if '_flashes' in session:
+        return render_template('item_detail.html', item=item)
+
+    viewer_id = current_user.id if current_user.is_authenticated else None
+    etag = hashlib.md5(repr((
+        item.id, item.title, item.description, item.category, item.location,
+        item.date_lost_found, item.image, item.status, item.user_id, viewer_id
+    )).encode()).hexdigest()
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        response = make_response(render_template('item_detail.html', item=item))
+    response.set_etag(etag)
+    return response
 
 
 @app.route('/item/<item_id>/edit')
@@ -358,12 +549,8 @@ def edit_item(item_id):
 
         if 'image' in request.files:
             file = request.files['image']
-            if file and file.filename != '' and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
-                filename = timestamp + filename
-                file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                item.image = filename
+            if file and file.filename != '' and allowed_file(file.filename) and has_image_signature(file):
+                item.image = save_upload(file)
 
         item.title = request.form['title'].strip()
         item.description = request.form['description'].strip()
@@ -372,6 +559,7 @@ def edit_item(item_id):
         item.date_lost_found = request.form.get('date_lost_found', '')
 
         db.session.commit()
+        invalidate_item_pages()
 
         flash('Item updated successfully!', 'success')
         return redirect(url_for('item_detail', item_id=item_id))
@@ -390,6 +578,7 @@ def delete_item(item_id):
     try:
         db.session.delete(item)
         db.session.commit()
+        invalidate_item_pages()
         flash('Item deleted successfully', 'success')
     except Exception as e:
         db.session.rollback()
@@ -401,25 +590,24 @@ def delete_item(item_id):
 
 @app.route('/search')
 def search():
-    query = request.args.get('q', '').strip()
-    if not query:
+    search_query = request.args.get('q', '').strip()
+    if not search_query:
         return redirect(url_for('index'))
+    page = max(request.args.get('page', 1, type=int), 1)
 
-    items = Item.query.filter(
+    query = Item.query.filter(
         Item.status == 'active',
-        db.or_(
-            Item.title.ilike(f'%{query}%'),
-            Item.description.ilike(f'%{query}%'),
-            Item.location.ilike(f'%{query}%'),
-            Item.category.ilike(f'%{query}%')
-        )
-    ).order_by(Item.date_posted.desc()).all()
+        matches_search(search_query)
+    )
+    items, has_next = paginate_items(query, page)
 
     return render_template('browse.html',
                            items=items,
                            item_type='search',
                            categories=CATEGORIES,
-                           search_query=query)
+                           search_query=search_query,
+                           page=page,
+                           has_next=has_next)
 
 
 # ===================
@@ -6,27 +6,15 @@ This script helps automate the deployment process
 
 import os
 import sys
+import importlib
+import shutil
 import subprocess
 import secrets
-from pathlib import Path
 
 def print_header(title):
     """Print a formatted header"""
-    print(f"\n{'='*50}")
-    print(f" {title}")
-    print(f"{'='*50}")
-
-def run_command(command, description):
-    """Run a shell command and handle errors"""
-    print(f"\n🔄 {description}...")
-    try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
-        print(f"✅ {description} completed successfully")
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {description} failed: {e}")
-        print(f"Error output: {e.stderr}")
-        return None
+    rule = '=' * 50
+    print(f"\n{rule}\n {title}\n{rule}")
 
 def check_requirements():
     """Check if required tools are installed"""
@@ -41,10 +29,10 @@ def check_requirements():
     missing_tools = []
     
     for tool, description in tools.items():
-        try:
-            subprocess.run([tool, '--version'], capture_output=True, check=True)
+        # PATH lookup only; no need to spawn the tool just to see that it exists
+        if shutil.which(tool):
             print(f"✅ {description} ({tool}) - Found")
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        else:
             print(f"❌ {description} ({tool}) - Missing")
             missing_tools.append(tool)
     
@@ -80,8 +68,13 @@ UPLOAD_FOLDER=/opt/render/project/src/static/uploads
 # MAIL_PASSWORD=your-app-password
 """
     
-    with open('.env', 'w') as f:
-        f.write(env_content)
+    # The file holds SECRET_KEY, so create it owner-only rather than chmod'ing afterwards
+    fd = os.open('.env', os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_CLOEXEC', 0), 0o600)
+    if hasattr(os, 'fchmod'):
+        # The mode above only applies on creation; tighten a .env left by earlier runs too
+        os.fchmod(fd, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(env_content.encode('utf-8'))
     
     print("✅ Created .env file")
     print("⚠️  Remember to update DATABASE_URL with your actual database credentials")
@@ -99,9 +92,11 @@ def check_files():
     ]
     
     missing_files = []
+    # One directory listing instead of a stat() per file
+    present = {entry.name for entry in os.scandir('.')}
     
     for file in required_files:
-        if Path(file).exists():
+        if file in present:
             print(f"✅ {file} - Found")
         else:
             print(f"❌ {file} - Missing")
@@ -118,8 +113,7 @@ def test_local_deployment():
     print_header("Testing Local Deployment")
     
     # Test with gunicorn if available
-    try:
-        subprocess.run(['gunicorn', '--version'], capture_output=True, check=True)
+    if shutil.which('gunicorn'):
         print("✅ Gunicorn found - testing production server...")
         
         # Start gunicorn in background
@@ -139,57 +133,55 @@ def test_local_deployment():
             process.terminate()
             print("\n✅ Server stopped")
             
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    else:
         print("⚠️  Gunicorn not found - testing with Flask development server...")
         print("⚠️  This is not recommended for production")
         
-        # Test with Flask
-        result = run_command(
-            'python -c "from app import app; print(\"✅ App imports successfully\")"',
-            "Testing app import"
-        )
-        
-        if result:
+        # Test with Flask by importing the app in this interpreter
+        print("\n🔄 Testing app import...")
+        try:
+            sys.path.insert(0, os.getcwd())
+            importlib.import_module('app')
             print("✅ Application can be imported successfully")
+        except Exception as e:
+            print(f"❌ Testing app import failed: {e}")
 
 def show_deployment_instructions():
     """Show deployment instructions for different platforms"""
     print_header("Deployment Instructions")
     
-    print("\n🌐 Choose your deployment platform:")
-    
-    print("\n1️⃣  RENDER (Recommended for beginners)")
-    print("   - Free tier available")
-    print("   - Easy setup")
-    print("   - Automatic deployments")
-    print("   📖 Guide: https://render.com/docs")
-    
-    print("\n2️⃣  RAILWAY")
-    print("   - Free tier available")
-    print("   - Simple deployment")
-    print("   - Good performance")
-    print("   📖 Guide: https://docs.railway.app/")
-    
-    print("\n3️⃣  HEROKU")
-    print("   - Excellent developer experience")
-    print("   - Great add-ons")
-    print("   - No free tier (paid only)")
-    print("   📖 Guide: https://devcenter.heroku.com/")
-    
-    print("\n4️⃣  AWS (Advanced)")
-    print("   - Highly scalable")
-    print("   - Pay-as-you-use")
-    print("   - Complex setup")
-    print("   📖 Guide: https://aws.amazon.com/")
-    
-    print("\n📋 Next Steps:")
-    print("1. Choose a platform from above")
-    print("2. Follow the platform-specific guide")
-    print("3. Set up your database")
-    print("4. Configure environment variables")
-    print("5. Deploy your application")
-    
-    print("\n📚 Full deployment guide available in DEPLOYMENT.md")
+    # Emit the whole block with one write instead of a print per line
+    lines = [
+        "\n🌐 Choose your deployment platform:",
+        "\n1️⃣  RENDER (Recommended for beginners)",
+        "   - Free tier available",
+        "   - Easy setup",
+        "   - Automatic deployments",
+        "   📖 Guide: https://render.com/docs",
+        "\n2️⃣  RAILWAY",
+        "   - Free tier available",
+        "   - Simple deployment",
+        "   - Good performance",
+        "   📖 Guide: https://docs.railway.app/",
+        "\n3️⃣  HEROKU",
+        "   - Excellent developer experience",
+        "   - Great add-ons",
+        "   - No free tier (paid only)",
+        "   📖 Guide: https://devcenter.heroku.com/",
+        "\n4️⃣  AWS (Advanced)",
+        "   - Highly scalable",
+        "   - Pay-as-you-use",
+        "   - Complex setup",
+        "   📖 Guide: https://aws.amazon.com/",
+        "\n📋 Next Steps:",
+        "1. Choose a platform from above",
+        "2. Follow the platform-specific guide",
+        "3. Set up your database",
+        "4. Configure environment variables",
+        "5. Deploy your application",
+        "\n📚 Full deployment guide available in DEPLOYMENT.md",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def main():
     """Main deployment script"""
@@ -1,9 +1,11 @@
 import mysql.connector
 from mysql.connector import Error
+import random
 import sys
 import time
 
-def wait_for_mysql(max_attempts=5, delay_seconds=2):
+def get_mysql_connection(max_attempts=8, base_delay=0.25, max_delay=8.0):
+    """Open a MySQL connection, retrying until the server is up; None if it never is"""
     for attempt in range(max_attempts):
         try:
             connection = mysql.connector.connect(
@@ -12,32 +14,26 @@ def wait_for_mysql(max_attempts=5, delay_seconds=2):
                 password='root'
             )
             if connection.is_connected():
-                connection.close()
-                return True
+                return connection
         except Error:
             if attempt < max_attempts - 1:
                 print(f"Attempting to connect to MySQL... (Attempt {attempt + 1}/{max_attempts})")
-                time.sleep(delay_seconds)
+                # Exponential backoff with jitter: quick early retries, no lockstep hammering
+                time.sleep(min(max_delay, base_delay * (2 ** attempt)) + random.uniform(0, 0.5))
             continue
-    return False
+    return None
 
 def init_database():
     connection = None
     try:
-        # Check if MySQL is running
-        if not wait_for_mysql():
+        # Connect to MySQL server, waiting for it to come up if needed
+        connection = get_mysql_connection()
+        if connection is None:
             print("Error: Could not connect to MySQL server. Please ensure:")
             print("1. MySQL server is installed")
             print("2. MySQL service is running")
             print("3. Credentials (root/root) are correct")
             sys.exit(1)
-
-        # Connect to MySQL server
-        connection = mysql.connector.connect(
-            host='localhost',
-            user='root',
-            password='root'
-        )
         
         if connection.is_connected():
             cursor = connection.cursor()
@@ -45,9 +41,6 @@ def init_database():
             # Create database if it doesn't exist
             cursor.execute("CREATE DATABASE IF NOT EXISTS lost_and_found")
             print("Database 'lost_and_found' created successfully")
-            
-            # Switch to the created database
-            cursor.execute("USE lost_and_found")
             print("Database setup completed successfully!")
             
     except Error as e:
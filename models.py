@@ -1,25 +1,31 @@
 from flask_login import UserMixin
-from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 
 db = SQLAlchemy()
 
+# Item ids compare byte-wise on PostgreSQL; MySQL has no "C" collation
+ITEM_ID_TYPE = db.String(8).with_variant(db.String(8, collation='C'), 'postgresql')
+
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
     
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(256), nullable=False)
+    # Only needed at login, which undefers it; skipped on the per-request user load
+    password_hash = deferred(db.Column(db.String(256), nullable=False))
     first_name = db.Column(db.String(50), nullable=False)
     last_name = db.Column(db.String(50), nullable=False)
     phone = db.Column(db.String(20))
     profile_image = db.Column(db.String(200))
     active = db.Column(db.Boolean, default=True, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, server_default=func.timezone('utc', func.now()), nullable=False)
     
     # Relationships
-    items = db.relationship('Item', backref='owner', lazy=True, cascade='all, delete-orphan')
+    items = db.relationship('Item', back_populates='owner', lazy=True, cascade='all, delete-orphan')
     notifications = db.relationship('Notification', backref='user', lazy=True, cascade='all, delete-orphan')
     
     def __repr__(self):
@@ -27,37 +33,64 @@ class User(UserMixin, db.Model):
 
 class Item(db.Model):
     __tablename__ = 'items'
+    __table_args__ = (
+        # Serves the active lost/found listings ordered by newest first
+        db.Index('ix_items_type_status_date', 'type', 'status', db.desc('date_posted')),
+        # Full-text search over title/description/location/category
+        db.Index('ix_items_search', 'search_vec', postgresql_using='gin'),
+        # Per-user listings and category filters on active items
+        db.Index('ix_items_user_status', 'user_id', 'status'),
+        db.Index('ix_items_category_status', 'category', 'status'),
+    )
     
-    id = db.Column(db.String(8), primary_key=True)
+    # Random URL-safe code
+    id = db.Column(ITEM_ID_TYPE, primary_key=True)
     type = db.Column(db.String(10), nullable=False)  # 'lost' or 'found'
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
     category = db.Column(db.String(50), nullable=False)
     location = db.Column(db.String(200), nullable=False)
-    date_posted = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    date_posted = db.Column(db.DateTime, nullable=False, server_default=func.timezone('utc', func.now()))
     date_lost_found = db.Column(db.String(20))
     image = db.Column(db.String(200))
     status = db.Column(db.String(20), nullable=False, default='active')
+
+    # Weighted full-text document maintained by Postgres; only loaded when accessed
+    search_vec = deferred(db.Column(TSVECTOR, db.Computed(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(location, '') || ' ' || coalesce(category, '')), 'C')",
+        persisted=True
+    )))
     
     # Foreign key to user
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
+    # Declared here (not as a backref) so Item.owner exists before mappers configure
+    owner = db.relationship('User', back_populates='items')
+    
     def __repr__(self):
         return f'<Item {self.title}>'
 
 class Notification(db.Model):
     __tablename__ = 'notifications'
+    __table_args__ = (
+        # Partial index holding only unread rows, for the per-user unread count
+        db.Index('ix_notifications_unread', 'user_id', postgresql_where=db.text('is_read = false')),
+        # Newest-first notification lists per user
+        db.Index('ix_notifications_user_created', 'user_id', db.desc('created_at')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     message = db.Column(db.Text, nullable=False)
     type = db.Column(db.String(20), nullable=False)  # 'lost_item', 'found_match', etc.
     is_read = db.Column(db.Boolean, default=False, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, server_default=func.timezone('utc', func.now()), nullable=False)
     
     # Foreign keys
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    item_id = db.Column(db.String(8), db.ForeignKey('items.id'), nullable=True)
+    item_id = db.Column(ITEM_ID_TYPE, db.ForeignKey('items.id'), nullable=True)
     
     # Relationship to item
     item = db.relationship('Item', backref='notifications')